@@ -0,0 +1,50 @@
+import numpy as np
+
+
+def _array_key(*arrays):
+    """builds a hashable cache key from the dtype, shape, and contents of each array
+
+    Arguments
+    ---------
+    arrays : numpy arrays (or scalars)
+        the arrays the cached value depends on
+
+    Returns
+    -------
+    _key : tuple
+        (dtype, shape, bytes) for each array, so equal bytes with a different
+        dtype or shape never collide
+
+    """
+    _key = ()
+    for _a in arrays:
+        _a = np.asarray(_a)
+        _key += (_a.dtype.str, _a.shape, _a.tobytes())
+    return _key
+
+
+def _cache_put(cache, max_size, key, value):
+    """stores an array in a bounded, insertion-ordered cache
+
+    Arguments
+    ---------
+    cache : dict
+        the cache to store into
+    max_size : int
+        the maximum number of entries the cache holds
+    key : hashable
+        the cache key, typically built with _array_key
+    value : numpy array
+        the array to cache; it is marked read-only because it is shared
+
+    Returns
+    -------
+    value : numpy array (read-only)
+
+    """
+    value.setflags(write=False)
+    if len(cache) >= max_size:
+        # dicts preserve insertion order, so this evicts the oldest entry
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+    return value
@@ -729,9 +729,11 @@ class TmmDriver(SpectrumDriver, Materials, Therml):
         # _ngr -> number of gradient dimensions
         _ngr = len(self.gradient_list)
 
-        self.reflectivity_gradient_array = np.zeros((_nwl, _ngr))
-        self.transmissivity_gradient_array = np.zeros((_nwl, _ngr))
-        self.emissivity_gradient_array = np.zeros((_nwl, _ngr))
+        # Fortran order keeps each gradient column contiguous, so the
+        # weights @ gradient_array products in Therml run as a gemv over unit-stride columns
+        self.reflectivity_gradient_array = np.zeros((_nwl, _ngr), order="F")
+        self.transmissivity_gradient_array = np.zeros((_nwl, _ngr), order="F")
+        self.emissivity_gradient_array = np.zeros((_nwl, _ngr), order="F")
 
         for i in range(0, _ngr):
             for j in range(0, _nwl):
@@ -1,10 +1,145 @@
+import warnings
 import numpy as np
 from scipy.special import spherical_jn
 from scipy.special import spherical_yn
-from scipy.special import jv
-from scipy.special import yv
 from .spectrum_driver import SpectrumDriver
 from .materials import Materials
+from ._cache import _array_key, _cache_put
+
+
+def _z_fn_prime(n, z, fn_values, fnm1_values):
+    """computes the derivative of z * f_n(z) from already-evaluated values of
+    f_n(z) and f_{n-1}(z) with the recurrence z * f_{n-1}(z) - n * f_n(z), which
+    holds for any spherical bessel function f_n (j_n, y_n, or h_n^{(1)})
+
+    Arguments
+    ---------
+    n : 1 x _max_coefficient array of int
+        orders of the bessel functions
+    z : float, complex float, or numpy array
+        variable passed to the bessel function; broadcasts against n
+    fn_values : numpy array
+        f_n(z) for each order in n
+    fnm1_values : numpy array
+        f_{n-1}(z) for each order in n
+
+    Returns
+    -------
+    _z_fn_prime
+
+    """
+    return z * fnm1_values - n * fn_values
+
+
+def mie_coefficients_batch(x, m, mu, n_max, out=None):
+    """computes the Mie a, b, c, and d coefficients for orders 1 to n_max
+
+    This is the stateless kernel behind MieDriver._compute_mie_coeffients.  It
+    does not touch any driver attributes, so it can be called for many radii or
+    materials at once, including from a thread pool: the SciPy special function
+    ufuncs and the NumPy arithmetic it is built from release the GIL.
+
+    Arguments
+    ---------
+    x : float or 1 x number_of_wavelengths numpy array of floats
+        size parameter of the sphere
+    m : complex float or 1 x number_of_wavelengths numpy array of complex floats
+        relative refractive index of the sphere to the medium
+    mu : complex float
+        relative permeability of the sphere to the medium (typically 1)
+    n_max : int
+        the maximum order in the Mie expansion
+    out : 4 x n_max x number_of_wavelengths numpy array of complex floats, optional
+        buffer the coefficients are written into; its dtype sets the precision they are
+        stored in, but they are always evaluated in double precision
+
+    Returns
+    -------
+    out : 4 x n_max x number_of_wavelengths numpy array of complex floats
+        a_n, b_n, c_n, and d_n stacked along the first axis
+
+    """
+    if out is None:
+        out = np.empty((4, n_max) + np.shape(x), dtype=complex)
+    _an, _bn, _cn, _dn = out
+
+    # j_n(m x) grows like exp(Im(m x)), which passes the float32 maximum already for
+    # micron-sized metal spheres, so the bessel functions and the coefficient
+    # assembly always run in double precision and only the bounded quotients are
+    # cast down when they are written into a single precision buffer
+    x = np.asarray(x, dtype=np.float64)
+    m = np.asarray(m, dtype=np.complex128)
+
+    # orders run along the first axis so that they broadcast against
+    # the wavelength axis of m and x when those are arrays
+    _n = np.reshape(np.arange(1, n_max + 1), (-1,) + (1,) * np.ndim(x)).astype(
+        np.float64
+    )
+    _mx = m * x
+
+    # evaluate each bessel function once for all orders 0 to n_max, then
+    # slice out the order n and order n-1 terms rather than calling the
+    # ufuncs separately for n and n-1 (which overlap in orders 1 to n_max - 1)
+    _orders = np.reshape(np.arange(0, n_max + 1), (-1,) + (1,) * np.ndim(x))
+    _jx = spherical_jn(_orders, x)
+    _yx = spherical_yn(_orders, x)
+    _jmx = spherical_jn(_orders, _mx)
+
+    _jnx, _jnm1x = _jx[1:], _jx[:-1]
+    _ynx, _ynm1x = _yx[1:], _yx[:-1]
+    _jnmx, _jnm1mx = _jmx[1:], _jmx[:-1]
+
+    # pre-compute terms that will be used numerous times in computing coefficients
+    _hnx = _jnx + 1j * _ynx
+    _hnm1x = _jnm1x + 1j * _ynm1x
+    _xjnxp = _z_fn_prime(_n, x, _jnx, _jnm1x)
+    _mxjnmxp = _z_fn_prime(_n, _mx, _jnmx, _jnm1mx)
+    _xhnxp = _z_fn_prime(_n, x, _hnx, _hnm1x)
+
+    # products of bessel terms shared between the numerators and denominators
+    # of the four coefficients; each is formed once rather than once per use
+    _jnmx_xjnxp = _jnmx * _xjnxp
+    _jnx_mxjnmxp = _jnx * _mxjnmxp
+    _jnmx_xhnxp = _jnmx * _xhnxp
+    _hnx_mxjnmxp = _hnx * _mxjnmxp
+
+    # the W-length factor m^2 / mu is formed once; dividing the a_n and d_n
+    # numerators and their shared denominator through by mu then removes the
+    # full (n_max, W) multiplications by mu from those expressions
+    _m2_over_mu = m * m / mu
+
+    # numerators and denominators are updated in place and the quotients
+    # are written straight into the coefficient buffer to avoid temporaries
+
+    # a_n and d_n share a denominator (scaled by 1 / mu), as do b_n and c_n
+    _ad_denominator = _m2_over_mu * _jnmx_xhnxp
+    _ad_denominator -= _hnx_mxjnmxp
+    _bc_denominator = mu * _jnmx_xhnxp
+    _bc_denominator -= _hnx_mxjnmxp
+
+    # c_n and d_n numerators differ only by factors of mu and m
+    _cd_numerator = _jnx * _xhnxp
+    _cd_numerator -= _hnx * _xjnxp
+
+    # a_n coefficients
+    _a_numerator = _m2_over_mu * _jnmx_xjnxp
+    _a_numerator -= _jnx_mxjnmxp
+    np.divide(_a_numerator, _ad_denominator, out=_an)
+
+    # b_n coefficients
+    _b_numerator = mu * _jnmx_xjnxp
+    _b_numerator -= _jnx_mxjnmxp
+    np.divide(_b_numerator, _bc_denominator, out=_bn)
+
+    # c_n coefficients
+    np.divide(_cd_numerator, _bc_denominator, out=_cn)
+    _cn *= mu
+
+    # d_n coefficients
+    np.multiply(m, _cd_numerator, out=_dn)
+    _dn /= _ad_denominator
+
+    return out
 
 
 class MieDriver(SpectrumDriver, Materials):
@@ -21,12 +156,20 @@ class MieDriver(SpectrumDriver, Materials):
     wavelength_array : 1 x number_of_wavelengths numpy array of floats
         the array of wavelengths in meters over which you will compute the spectra
 
+    _k_array : 1 x number_of_wavelengths numpy array of floats
+        the vacuum wavenumber 2 * pi / lambda for each wavelength
+
     _size_factor_array : 1 x number_of_wavelengths numpy array of floats
         size factor of the sphere
 
     _relative_refractive_index_array : 1 x number_of_wavelengths numpy array of complex floats
         the array of refractive index values corresponding to wavelength_array
 
+    precision : str
+        "double" (default) or "single"; sets the precision the Mie coefficients are
+        stored in (complex128 or complex64); the size parameters, refractive indices,
+        and the coefficient evaluation itself are always double precision
+
     _medium_refractive_index : float
         the refractive index of the surrounding medium - assumed to be real and wavelength-independent
 
@@ -49,11 +192,21 @@ class MieDriver(SpectrumDriver, Materials):
         the absorption efficiency as a function of wavelength
 
     _max_coefficient_n : int
-        the maximum coefficient to be computed in the Mie expansion
+        the maximum coefficient to be computed in the Mie expansion; this is not stored
+        as a separate attribute, use self._n_array[-1]
 
     _n_array : 1 x _max_coefficient_n array of ints
         array of indices for the terms in the Mie expansion
 
+    _two_n_plus_1 : 1 x _max_coefficient_n array of floats
+        the (2n + 1) weights of each term in the Mie expansion
+
+    _n_max_array : 1 x number_of_wavelengths numpy array of ints
+        the maximum order of the Mie expansion for each wavelength
+
+    _n_mask : _max_coefficient_n x number_of_wavelengths numpy array of bools
+        True where an order lies within the n_max of that wavelength
+
     _an : _max_coefficient x number_of_wavelengths numpy array of complex floats
         the array of a coefficients in the Mie expansion
 
@@ -66,6 +219,12 @@ class MieDriver(SpectrumDriver, Materials):
     _dn : _max_coefficientx x number_of_wavelengths numpy array of complex floats
         the array of d coefficients in the Mie expansion
 
+    _mie_coeffs : 4 x _max_coefficient x number_of_wavelengths numpy array of complex floats
+        contiguous storage for the a, b, c, and d coefficients; _an, _bn, _cn, and _dn are views into it
+
+    _coef_cache : dict
+        Mie coefficients shared by all MieDriver instances, keyed on the size parameters,
+        relative refractive indices, and relative permeability; holds at most _coef_cache_size entries
 
     Returns
     -------
@@ -76,10 +235,14 @@ class MieDriver(SpectrumDriver, Materials):
     >>> fill_in_with_actual_example!
     """
 
+    # bounded cache of Mie coefficient buffers; shared across instances so that
+    # constructing drivers for the same sphere again (e.g. in a design loop)
+    # skips the Bessel evaluations entirely
+    _coef_cache = {}
+    _coef_cache_size = 16
+
     def __init__(self, args):
         self.parse_input(args)
-        print("Radius of the sphere is ", self.radius)
-        self.ci = 0 + 1j
 
         self.set_refractive_indicex_array()
         self.compute_spectrum()
@@ -92,12 +255,14 @@ class MieDriver(SpectrumDriver, Materials):
 
         if "wavelength_list" in args:
             lamlist = args["wavelength_list"]
-            self.wavelength_array = np.linspace(lamlist[0], lamlist[1], int(lamlist[2]))
+            self.wavelength_array = np.linspace(
+                lamlist[0], lamlist[1], int(lamlist[2]), dtype=np.float64
+            )
             self.number_of_wavelengths = int(lamlist[2])
             self.wavenumber_array = 1 / self.wavelength_array
         # default wavelength array
         else:
-            self.wavelength_array = np.linspace(400e-9, 800e-9, 10)
+            self.wavelength_array = np.linspace(400e-9, 800e-9, 10, dtype=np.float64)
             self.number_of_wavelengths = 10
             self.wavenumber_array = 1 / self.wavelength_array
 
@@ -111,12 +276,39 @@ class MieDriver(SpectrumDriver, Materials):
         else:
             self.medium_material = "air"
 
+        # "single" stores the Mie coefficients as complex64, halving the memory
+        # of the coefficient buffer and cache; default is "double"
+        if "precision" in args:
+            self.precision = args["precision"].lower()
+        else:
+            self.precision = "double"
+
+        if self.precision == "single":
+            self._complex_dtype = np.complex64
+        elif self.precision == "double":
+            self._complex_dtype = np.complex128
+        else:
+            raise ValueError(
+                "precision must be 'single' or 'double', not '%s'" % args["precision"]
+            )
+
         self.number_of_layers = 3
         self._refractive_index_array = np.ones(
             (self.number_of_wavelengths, 3), dtype=complex
         )
         self._relative_permeability = 1.0 + 0j
-        self._size_factor_array = np.pi * 2 * self.radius / self.wavelength_array
+        # vacuum wavenumber 2 * pi / lambda for each wavelength
+        self._k_array = 2 * np.pi / self.wavelength_array
+        # kept as a contiguous 1-D array: it broadcasts as a
+        # row against the (n_max, 1) column of orders in mie_coefficients_batch, so
+        # wavelength is the contiguous inner axis of every (n_max, W) array there
+        self._size_factor_array = np.ascontiguousarray(
+            self._k_array * self.radius, dtype=np.float64
+        )
+        # (2n + 1) weights for the efficiency sums, filled in by _compute_n_array
+        self._two_n_plus_1 = None
+        # coefficient buffer, allocated by _compute_mie_coeffients
+        self._mie_coeffs = None
 
         self.q_ext = np.zeros_like(self.wavelength_array)
         self.q_scat = np.zeros_like(self.wavelength_array)
@@ -203,21 +395,19 @@ class MieDriver(SpectrumDriver, Materials):
         TBD
 
         """
-        for i in range(0, len(self.wavelength_array)):
-            # get Mie coefficients... stored in attriubutes
-            m_val = self._relative_refractive_index_array[i]
-            mu_val = self._relative_permeability
-            x_val = self._size_factor_array[i]
-            self._compute_mie_coeffients(m_val, mu_val, x_val)
-
-            # compute q_scat
-            self.q_scat[i] = self._compute_q_scattering(x_val)
-            self.q_ext[i] = self._compute_q_extinction(x_val)
-            self.q_abs[i] = self.q_ext[i] - self.q_scat[i]
+        # get Mie coefficients for every wavelength at once... stored in attributes
+        m_val = self._relative_refractive_index_array
+        mu_val = self._relative_permeability
+        x_val = self._size_factor_array
+        self._compute_mie_coeffients(m_val, mu_val, x_val)
+
+        # compute q_scat, q_ext, and q_abs for all wavelengths
+        self.q_scat = self._compute_q_scattering(x_val)
+        self.q_ext = self._compute_q_extinction(x_val)
+        self.q_abs = self.q_ext - self.q_scat
 
     def _compute_s_jn(self, n, z):
-        """Compute the spherical bessel function from the Bessel function
-        of the first kind
+        """Compute the spherical bessel function of the first kind j_n
 
         Arguments
         ---------
@@ -237,12 +427,10 @@ class MieDriver(SpectrumDriver, Materials):
         Yes
 
         """
-        ns = n + 0.5
-        return np.sqrt(np.pi / (2 * z)) * jv(ns, z)
+        return spherical_jn(n, z)
 
     def _compute_s_yn(self, n, z):
-        """Compute the spherical bessel function from the Bessel function
-        of the first kind
+        """Compute the spherical bessel function of the second kind y_n
 
         Arguments
         ---------
@@ -255,15 +443,14 @@ class MieDriver(SpectrumDriver, Materials):
 
         Returns
         -------
-        _s_jn
+        _s_yn
 
         Test Implemented
         ----------------
         Yes
 
         """
-        ns = n + 0.5
-        return np.sqrt(np.pi / (2 * z)) * yv(ns, z)
+        return spherical_yn(n, z)
 
     def _compute_s_hn(self, n, z):
         """Compute the spherical bessel function h_n^{(1)}
@@ -285,7 +472,7 @@ class MieDriver(SpectrumDriver, Materials):
         ----------------
         Yes
         """
-        return spherical_jn(n, z) + self.ci * spherical_yn(n, z)
+        return spherical_jn(n, z) + 1j * spherical_yn(n, z)
 
     def _compute_z_jn_prime(self, n, z):
         """Compute derivative of z*j_n(z) using recurrence relations
@@ -306,7 +493,7 @@ class MieDriver(SpectrumDriver, Materials):
         Yes
 
         """
-        return z * spherical_jn(n - 1, z) - n * spherical_jn(n, z)
+        return _z_fn_prime(n, z, spherical_jn(n, z), spherical_jn(n - 1, z))
 
     def _compute_z_hn_prime(self, n, z):
         """Compute derivative of z*h_n^{(1)}(z) using recurrence relations
@@ -324,20 +511,18 @@ class MieDriver(SpectrumDriver, Materials):
 
         """
 
-        return z * self._compute_s_hn(n - 1, z) - n * self._compute_s_hn(n, z)
+        return _z_fn_prime(n, z, self._compute_s_hn(n, z), self._compute_s_hn(n - 1, z))
 
     def _compute_mie_coeffients(self, m, mu, x):
         """computes the Mie coefficients given relative refractive index,
 
         Arguments
         ---------
-        n : 1 x _max_coefficient array of ints
-            order of the mie coefficients functions
-        m : complex float
+        m : complex float or 1 x number_of_wavelengths numpy array of complex floats
             relative refractive index of the sphere to the medium
         mu : complex float
             relative permeability of the sphere to the medium (typically 1)
-        x : float
+        x : float or 1 x number_of_wavelengths numpy array of floats
             size parameter of the sphere
 
         Attributes
@@ -350,41 +535,62 @@ class MieDriver(SpectrumDriver, Materials):
 
         _dn
 
+        Notes
+        -----
+        when m and x are arrays, the coefficients for all wavelengths are
+        computed at once and are _max_coefficient_n x number_of_wavelengths arrays
+
+        the coefficient buffer is re-used between calls of the same shape, so
+        copy _an, _bn, _cn, or _dn if they need to outlive the next call
+
         """
         self._compute_n_array(x)
         # self._n_array will be an array from 1 to n_max
+        x = np.asarray(x, dtype=np.float64)
+        m = np.asarray(m, dtype=np.complex128)
+
+        # a_n, b_n, c_n, d_n are stored contiguously in one buffer and
+        # _an, _bn, _cn, _dn are views into it; the buffer is only
+        # re-allocated when n_max, the number of wavelengths, or the precision change
+        _shape = (4, len(self._n_array)) + np.shape(x)
+        if (
+            self._mie_coeffs is None
+            or self._mie_coeffs.shape != _shape
+            or self._mie_coeffs.dtype != self._complex_dtype
+        ):
+            self._mie_coeffs = np.empty(_shape, dtype=self._complex_dtype)
+            self._an = self._mie_coeffs[0]
+            self._bn = self._mie_coeffs[1]
+            self._cn = self._mie_coeffs[2]
+            self._dn = self._mie_coeffs[3]
+
+        # the size parameters fix n_max, so they, m, and mu fully determine the
+        # coefficients; the storage precision keeps single and double entries apart
+        _key = _array_key(x, m) + (complex(mu), self._mie_coeffs.dtype.str)
+        _cached = self._coef_cache.get(_key)
+        if _cached is not None:
+            np.copyto(self._mie_coeffs, _cached)
+            return
+
+        # every wavelength is evaluated up to the largest n_max, and for large spheres
+        # the bessel functions of the orders beyond a wavelength's own n_max can
+        # overflow; those orders are discarded below, so only non-finite values
+        # within the n_max of a wavelength are worth reporting
+        with np.errstate(over="ignore", invalid="ignore", divide="ignore"):
+            mie_coefficients_batch(x, m, mu, self._n_array[-1], out=self._mie_coeffs)
+        # zero the orders beyond each wavelength's own n_max so that every wavelength
+        # keeps the truncation it would have if it were computed on its own
+        np.copyto(self._mie_coeffs, 0.0, where=~self._n_mask)
+        if not np.all(np.isfinite(self._mie_coeffs)):
+            warnings.warn(
+                "non-finite Mie coefficients within n_max; the sphere may be too "
+                "large for the bessel functions to be evaluated in double precision",
+                RuntimeWarning,
+            )
 
-        # pre-compute terms that will be used numerous times in computing coefficients
-        _jnx = spherical_jn(self._n_array, x)
-        _jnmx = spherical_jn(self._n_array, m * x)
-        _hnx = self._compute_s_hn(self._n_array, x)
-        _xjnxp = self._compute_z_jn_prime(self._n_array, x)
-        _mxjnmxp = self._compute_z_jn_prime(self._n_array, m * x)
-        _xhnxp = self._compute_z_hn_prime(self._n_array, x)
-
-        # a_n coefficients
-        _a_numerator = m ** 2 * _jnmx * _xjnxp - mu * _jnx * _mxjnmxp
-        _a_denominator = m ** 2 * _jnmx * _xhnxp - mu * _hnx * _mxjnmxp
-
-        self._an = _a_numerator / _a_denominator
-
-        # b_n coefficients
-        _b_numerator = mu * _jnmx * _xjnxp - _jnx * _mxjnmxp
-        _b_denominator = mu * _jnmx * _xhnxp - _hnx * _mxjnmxp
-
-        self._bn = _b_numerator / _b_denominator
-
-        # c_n coefficients
-        _c_numerator = mu * _jnx * _xhnxp - mu * _hnx * _xjnxp
-        _c_denominator = mu * _jnmx * _xhnxp - _hnx * _mxjnmxp
-
-        self._cn = _c_numerator / _c_denominator
-
-        # d_n coefficients
-        _d_numerator = mu * m * _jnx * _xhnxp - mu * m * _hnx * _xjnxp
-        _d_denominator = m ** 2 * _jnmx * _xhnxp - mu * _hnx * _mxjnmxp
-
-        self._dn = _d_numerator / _d_denominator
+        _cache_put(
+            self._coef_cache, self._coef_cache_size, _key, self._mie_coeffs.copy()
+        )
         # return [self._an,self._bn,self._cn,self._dn]
 
     def _compute_q_scattering(self, x):
@@ -411,18 +617,13 @@ class MieDriver(SpectrumDriver, Materials):
         q_scat
 
         """
-        # c = self._compute_mie_coeffients(m, mu, x)
-        an = self._an
-        bn = self._bn
-
-        q_scat = 0.0
-        for i in range(0, len(an)):
-            # n is i + 1
-            # because i indexes the arrays, n is the multipole order
-            n = i + 1
-            q_scat = q_scat + 2 / x ** 2 * (2 * n + 1) * (
-                np.abs(an[i]) ** 2 + np.abs(bn[i]) ** 2
-            )
+        # |a_n|^2 + |b_n|^2 in a single pass over the packed coefficient buffer,
+        # using re^2 + im^2 directly rather than squaring np.abs (which takes a sqrt)
+        _ab = self._mie_coeffs[:2]
+        _ab_sq = np.sum(_ab.real * _ab.real + _ab.imag * _ab.imag, axis=0)
+
+        # sum over multipole orders weighted by (2n + 1)
+        q_scat = 2 / x ** 2 * (self._two_n_plus_1 @ _ab_sq)
 
         return q_scat
 
@@ -452,22 +653,26 @@ class MieDriver(SpectrumDriver, Materials):
 
         """
 
-        # c = self._compute_mie_coeffients(m, mu, x)
-        an = self._an
-        bn = self._bn
+        # Re(a_n + b_n) in a single pass over the packed coefficient buffer
+        _ab_re = np.sum(np.real(self._mie_coeffs[:2]), axis=0)
 
-        q_ext = 0
-        for i in range(0, len(an)):
-            # n is i + 1
-            # because i indexes the arrays, n is the multipole order
-            n = i + 1
-            q_ext = q_ext + 2 / x ** 2 * (2 * n + 1) * np.real(an[i] + bn[i])
+        # sum over multipole orders weighted by (2n + 1)
+        q_ext = 2 / x ** 2 * (self._two_n_plus_1 @ _ab_re)
 
         return q_ext
 
     def _compute_n_array(self, x):
-        _n_max = int(x + 4 * x ** (1 / 3.0) + 2)
-        self._n_array = np.copy(np.linspace(1, _n_max, _n_max, dtype=int))
+        # n_max for each size parameter; when x is an array the largest of these
+        # sets the number of orders computed for every wavelength
+        _x = np.asarray(x, dtype=np.float64)
+        self._n_max_array = (_x + 4 * _x ** (1 / 3.0) + 2).astype(np.int64)
+        _n_max = int(np.max(self._n_max_array))
+        self._n_array = np.arange(1, _n_max + 1, dtype=np.int64)
+        self._two_n_plus_1 = (2 * self._n_array + 1).astype(np.float64)
+        # True for the orders that lie within each wavelength's own n_max
+        self._n_mask = (
+            np.reshape(self._n_array, (-1,) + (1,) * _x.ndim) <= self._n_max_array
+        )
 
     def _compute_gl(l, r, h, mu, omega_p, eps_inf, eps_d):
         """docstring goes here!"""
@@ -7,6 +7,8 @@ import wptherml
 import numpy as np
 import pytest
 import sys
+import warnings
+from wptherml.mie import _z_fn_prime, mie_coefficients_batch
 
 
 """ perform a series of tests that would apply to the simple
@@ -172,6 +174,20 @@ def test_compute_z_jn_prime():
     )
 
 
+def test_z_fn_prime():
+    """test private function _z_fn_prime(n, z, fn, fnm1) from wptherml.mie"""
+
+    _n = mietest._n_array
+    _x = mietest._size_factor_array[0]
+
+    result = _z_fn_prime(
+        _n, _x, mietest._compute_s_jn(_n, _x), mietest._compute_s_jn(_n - 1, _x)
+    )
+    expected_result = mietest._compute_z_jn_prime(_n, _x)
+
+    assert np.allclose(result, expected_result, 1e-5)
+
+
 def test_compute_z_hn_prime():
     """test private method in MieDriver _compute_z_hn_prime(n, z)"""
 
@@ -210,3 +226,120 @@ def test_compute_q_extinction():
 
     result = mietest._compute_q_extinction(mietest._size_factor_array[0])
     assert np.isclose(result, expected_result, 1e-5)
+
+
+def test_single_precision():
+    """test that single precision Mie efficiencies agree with double precision"""
+    _args = {
+        "radius": 100e-9,
+        "wavelength_list": [400e-9, 800e-9, 10],
+        "sphere_material": "ag",
+        "medium_material": "air",
+    }
+    _double = sf.spectrum_factory("Mie", _args)
+    _args["precision"] = "single"
+    _single = sf.spectrum_factory("Mie", _args)
+
+    assert _single._an.dtype == np.complex64
+    assert np.allclose(_single.q_ext, _double.q_ext, 1e-4)
+    assert np.allclose(_single.q_scat, _double.q_scat, 1e-4)
+
+
+def test_single_precision_large_sphere():
+    """test that single precision stays finite for a micron-sized metal sphere, where
+    j_n(m x) exceeds the float32 range"""
+    _args = {
+        "radius": 5e-6,
+        "wavelength_list": [300e-9, 3000e-9, 200],
+        "sphere_material": "au",
+        "medium_material": "air",
+    }
+    _double = sf.spectrum_factory("Mie", _args)
+    _args["precision"] = "single"
+    _single = sf.spectrum_factory("Mie", _args)
+
+    assert np.all(np.isfinite(_single.q_ext))
+    assert np.allclose(_single.q_ext, _double.q_ext, 1e-4)
+    assert np.allclose(_single.q_scat, _double.q_scat, 1e-4)
+
+
+def test_unknown_precision():
+    """test that an unsupported precision is rejected"""
+    _args = {"precision": "half"}
+    with pytest.raises(ValueError):
+        sf.spectrum_factory("Mie", _args)
+
+
+def test_mie_coefficients_batch():
+    """test that batched Mie coefficients match the per-wavelength calculation"""
+
+    _x = np.array([0.5, 1.2, 2.0])
+    _m = np.array([1.5 + 0.1j, 1.4 + 0.0j, 2.0 + 1.0j])
+    _n_max = 8
+
+    result = mie_coefficients_batch(_x, _m, 1.0 + 0j, _n_max)
+    assert result.shape == (4, _n_max, 3)
+
+    for i in range(0, len(_x)):
+        expected_result = mie_coefficients_batch(_x[i], _m[i], 1.0 + 0j, _n_max)
+        assert np.allclose(result[:, :, i], expected_result, 1e-10)
+
+
+@pytest.mark.parametrize(
+    "radius, wavelength_list",
+    [
+        # size parameters from ~0.3 to ~21
+        (1e-6, [300e-9, 20000e-9, 60]),
+        # size parameters from ~0.6 to ~105; the orders beyond the n_max of the
+        # long wavelengths overflow in the batch and must be discarded silently
+        (5e-6, [300e-9, 50000e-9, 100]),
+    ],
+)
+def test_broadband_spectrum(radius, wavelength_list):
+    """test that the vectorized spectrum matches a per-wavelength calculation, i.e. that
+    each wavelength keeps its own n_max, without raising any floating point warnings"""
+    _args = {
+        "radius": radius,
+        "wavelength_list": wavelength_list,
+        "sphere_material": "au",
+        "medium_material": "air",
+    }
+    # make sure the batch is actually evaluated rather than served from the cache
+    wptherml.MieDriver._coef_cache.clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        _broadband = sf.spectrum_factory("Mie", _args)
+        _x = _broadband._size_factor_array
+        _m = _broadband._relative_refractive_index_array
+        _mu = _broadband._relative_permeability
+
+        _loop = sf.spectrum_factory("Mie", _args)
+        expected_q_ext = np.zeros_like(_broadband.q_ext)
+        expected_q_scat = np.zeros_like(_broadband.q_scat)
+        for i in range(0, len(_x)):
+            _loop._compute_mie_coeffients(_m[i], _mu, _x[i])
+            expected_q_ext[i] = _loop._compute_q_extinction(_x[i])
+            expected_q_scat[i] = _loop._compute_q_scattering(_x[i])
+
+    assert np.allclose(_broadband.q_ext, expected_q_ext, rtol=1e-13, atol=0)
+    assert np.allclose(_broadband.q_scat, expected_q_scat, rtol=1e-13, atol=0)
+
+
+def test_coefficient_cache():
+    """test that a cache hit reproduces the coefficients and is not aliased to the driver buffer"""
+    _args = {
+        "radius": 75e-9,
+        "wavelength_list": [400e-9, 800e-9, 10],
+        "sphere_material": "au",
+        "medium_material": "air",
+    }
+    _first = sf.spectrum_factory("Mie", _args)
+    _expected_an = np.copy(_first._an)
+    _expected_q_ext = np.copy(_first.q_ext)
+
+    # overwriting the first driver's buffer must not leak into the cache
+    _first._mie_coeffs[:] = 0.0
+
+    _second = sf.spectrum_factory("Mie", _args)
+    assert np.allclose(_second._an, _expected_an, 1e-10)
+    assert np.allclose(_second.q_ext, _expected_q_ext, 1e-10)
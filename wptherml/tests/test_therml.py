@@ -242,3 +242,83 @@ def test_compute_cooling_gradient():
         _numeric_atmospheric_warming_power_gradient,
         1e-2,
     )
+
+
+def test_blackbody_spectrum_cache():
+    """test that cached blackbody spectra are re-used and keyed on temperature"""
+    test = wptherml.Therml({"temperature": 1000})
+    wavelength_array = np.linspace(400e-9, 7000e-9, 100)
+
+    _bb_1000 = test._compute_blackbody_spectrum(wavelength_array, 1000)
+    assert test._compute_blackbody_spectrum(wavelength_array, 1000) is _bb_1000
+
+    _bb_1500 = test._compute_blackbody_spectrum(wavelength_array, 1500)
+    assert _bb_1500 is not _bb_1000
+    assert np.all(_bb_1500 > _bb_1000)
+
+
+def test_blackbody_spectrum_overflow():
+    """test that the far short-wavelength tail at low temperature is exactly zero without warnings"""
+    test = wptherml.Therml({})
+    wavelength_array = np.array([10e-9, 100e-9, 10000e-9])
+
+    with np.errstate(over="raise"):
+        _bb = test._compute_blackbody_spectrum(wavelength_array, 50)
+
+    assert _bb[0] == 0.0
+    assert _bb[1] == 0.0
+    assert np.isfinite(_bb[2]) and _bb[2] > 0
+
+
+def test_compute_therml_spectrum_batch():
+    """test that the batched blackbody spectra match the single-temperature spectra row by row"""
+    test = wptherml.Therml({})
+    wavelength_array = np.linspace(300e-9, 20000e-9, 200)
+    T_array = np.array([300, 500, 1000, 3000])
+
+    test._compute_therml_spectrum_batch(wavelength_array, T_array)
+
+    assert test.blackbody_batch.shape == (len(T_array), len(wavelength_array))
+    for i, T in enumerate(T_array):
+        assert np.allclose(
+            test.blackbody_batch[i],
+            test._compute_blackbody_spectrum(wavelength_array, T),
+            rtol=1e-12,
+        )
+
+
+def test_compute_quadrature_weights():
+    """test that the trapezoid weights reproduce the trapezoid rule on a non-uniform grid"""
+    test = wptherml.Therml({})
+    wavelength_array = np.geomspace(300e-9, 20000e-9, 500)
+    f = np.sin(wavelength_array * 1e6) ** 2
+
+    _w = test._compute_quadrature_weights(wavelength_array)
+    expected_result = np.sum(np.diff(wavelength_array) * 0.5 * (f[1:] + f[:-1]))
+
+    assert np.isclose(f @ _w, expected_result, 1e-12)
+
+
+def test_compute_nearest_wavelength_index():
+    """test that the binary search matches argmin on ties, at both endpoints, and on
+    either grid ordering"""
+    test = wptherml.Therml({})
+    _ascending = np.linspace(300e-9, 3000e-9, 100)
+    _descending = _ascending[::-1].copy()
+    _uniform = np.array([1.0, 2.0, 3.0, 4.0])
+
+    for wavelength_array, target_wavelength in [
+        (_ascending, 2000e-9),
+        (_ascending, 100e-9),
+        (_ascending, 5000e-9),
+        (_ascending, 300e-9),
+        (_ascending, 3000e-9),
+        (_descending, 2000e-9),
+        (_descending, 100e-9),
+        (_descending, 5000e-9),
+        (_uniform, 2.5),
+        (_uniform[::-1].copy(), 2.5),
+    ]:
+        expected_result = np.abs(wavelength_array - target_wavelength).argmin()
+        result = test._compute_nearest_wavelength_index(wavelength_array, target_wavelength)
+        assert result == expected_result
@@ -1,5 +1,16 @@
 import numpy as np
-from scipy.interpolate import UnivariateSpline
+from ._cache import _array_key, _cache_put
+
+# speed of light in SI
+_C = 299792458.0
+# plancks constant in SI
+_H = 6.62607004e-34
+# boltzmanns constant in SI
+_KB = 1.38064852e-23
+# derived constants of Planck's law
+_HC = _H * _C
+_2HC2 = 2 * _H * _C * _C
+_HC_KB = _HC / _KB
 
 
 class Therml:
@@ -49,6 +60,10 @@ class Therml:
     self.stpv_spectral_efficiency_gradient : numpy array of floats (will be computed by this function)
         the gradient vector related to the spectral efficiency wrt changes in thicknesses of each layer
 
+    self._bb_cache : dict
+        blackbody spectra shared by all instances, keyed on the wavelength grid and temperature;
+        holds at most self._bb_cache_size entries
+
 
     Returns
     -------
@@ -56,6 +71,12 @@ class Therml:
 
     """
 
+    # bounded cache of blackbody spectra; the spectrum only depends on the wavelength
+    # grid and the temperature, so repeated calls (every angle loop and every step of
+    # an optimization) can re-use it
+    _bb_cache = {}
+    _bb_cache_size = 8
+
     def __init__(self, args):
         """constructor for the Therml class"""
         # parse args
@@ -154,33 +175,143 @@ class Therml:
         thermal_emission_array : Eq (12) of https://github.com/FoleyLab/wptherml/blob/master/docs/Equations.pdf
         with $\theta=0$
         """
-        # get the dimension of the gradient vector
-        _ngr = len(emissivity_gradient_array[0, :])
-        # get the number of wavelengths
-        _nwl = len(wavelength_array)
-        # initialize the gradient array
-        self.thermal_emission_gradient_array = np.zeros((_nwl, _ngr))
-
         self.blackbody_spectrum = self._compute_blackbody_spectrum(wavelength_array, self.temperature)
 
-        for i in range(0, _ngr):
-            self.thermal_emission_gradient_array[:, i] = (
-                self.blackbody_spectrum * emissivity_gradient_array[:, i]
-            )
+        # broadcast the blackbody spectrum across every column of the
+        # number_of_wavelengths x number_of_gradient_elements emissivity gradient;
+        # store in Fortran order so each gradient column is contiguous
+        self.thermal_emission_gradient_array = np.multiply(
+            self.blackbody_spectrum[:, np.newaxis], emissivity_gradient_array, order="F"
+        )
+
+    def _compute_therml_spectrum_batch(self, wavelength_array, T_array):
+        """method to compute Planck's blackbody spectrum for several temperatures at once,
+        e.g. for temperature sweeps, with a single expm1 evaluation over all of them
+
+        Arguments
+        ---------
+        wavelength_array : numpy array of floats
+            the array of wavelengths across which the blackbody spectra will be computed
+
+        T_array : numpy array of floats
+            the temperatures in Kelvin
+
+        Attributes
+        ----------
+        blackbody_batch : number_of_temperatures x number_of_wavelengths numpy array of floats
+            Planck's blackbody spectrum for each temperature in T_array
+
+        References
+        ----------
+        blackbody spectrum : Eq. (13) of https://github.com/FoleyLab/wptherml/blob/master/docs/Equations.pdf
+        """
+        wavelength_array = np.asarray(wavelength_array, dtype=np.float64)
+        _X = _HC_KB / np.outer(T_array, wavelength_array)
+        _B = _2HC2 / wavelength_array ** 5
+
+        # expm1 overflowing to inf gives the correct limit of 0, see _compute_blackbody_spectrum
+        with np.errstate(over="ignore"):
+            np.expm1(_X, out=_X)
+        self.blackbody_batch = np.divide(_B[np.newaxis, :], _X, out=_X)
 
     def _compute_blackbody_spectrum(self, wavelength_array, T):
-        # speed of light in SI
-        c = 299792458
-        # plancks constant in SI
-        h = 6.62607004e-34
-        # boltzmanns constant in SI
-        kb = 1.38064852e-23
-
-        _bb_spectrum = 2 * h * c ** 2 / wavelength_array ** 5
-        _bb_spectrum /= (
-            np.exp(h * c / (wavelength_array * kb * T)) - 1
-        )
-        return _bb_spectrum 
+        """method to compute Planck's blackbody spectrum, re-using a cached
+        spectrum when the same wavelength grid and temperature have been seen before
+
+        Arguments
+        ---------
+        wavelength_array : numpy array of floats
+            the array of wavelengths across which the blackbody spectrum will be computed
+
+        T : float
+            the temperature in Kelvin
+
+        Returns
+        -------
+        _bb_spectrum : numpy array of floats (read-only)
+            Planck's blackbody spectrum for temperature T
+
+        """
+        _key = _array_key(wavelength_array) + (float(T),)
+        _bb_spectrum = self._bb_cache.get(_key)
+        if _bb_spectrum is not None:
+            return _bb_spectrum
+
+        # evaluate 2 h c^2 / lambda^5 / expm1(h c / lambda kb T) in place in a
+        # single buffer rather than through a chain of full-length temporaries
+        _bb_spectrum = np.multiply(wavelength_array, T, dtype=np.float64)
+        np.divide(_HC_KB, _bb_spectrum, out=_bb_spectrum)
+        # hc / lambda kb T exceeds ~709 at short wavelengths / low temperatures, where
+        # expm1 overflows to inf; 2 h c^2 / inf = 0 is the correct limit, so the
+        # overflow is expected and not worth a warning
+        with np.errstate(over="ignore"):
+            np.expm1(_bb_spectrum, out=_bb_spectrum)
+        _bb_spectrum *= wavelength_array ** 5
+        np.divide(_2HC2, _bb_spectrum, out=_bb_spectrum)
+
+        return _cache_put(self._bb_cache, self._bb_cache_size, _key, _bb_spectrum)
+
+    def _compute_quadrature_weights(self, wavelength_array):
+        """method to compute the trapezoid rule weights for a wavelength grid, so that
+        np.trapz(f, wavelength_array) == f @ weights
+
+        Arguments
+        ---------
+        wavelength_array : numpy array of floats
+            the wavelengths that will be integrated over
+
+        Returns
+        -------
+        _quad_w : numpy array of floats
+            the trapezoid weight of each wavelength in wavelength_array
+
+        """
+        # the weights cost one O(N) pass, no more than hashing the grid for a cache
+        # key would, so they are simply recomputed on every call
+        _quad_w = np.zeros(len(wavelength_array))
+        if len(wavelength_array) > 1:
+            _dw = np.diff(wavelength_array)
+            _quad_w[1:-1] = 0.5 * (_dw[:-1] + _dw[1:])
+            _quad_w[0] = 0.5 * _dw[0]
+            _quad_w[-1] = 0.5 * _dw[-1]
+
+        return _quad_w
+
+    def _compute_nearest_wavelength_index(self, wavelength_array, target_wavelength):
+        """method to find the index of the element of wavelength_array closest to target_wavelength
+
+        Arguments
+        ---------
+        wavelength_array : numpy array of floats
+            the wavelengths to search, sorted in increasing or decreasing order
+
+        target_wavelength : float
+            the wavelength to locate
+
+        Returns
+        -------
+        _idx : int
+            the same index as np.abs(wavelength_array - target_wavelength).argmin(),
+            including on ties; found with an O(log N) binary search instead of an
+            O(N) scan when wavelength_array is increasing
+
+        """
+        _n = len(wavelength_array)
+        if _n > 1 and wavelength_array[0] > wavelength_array[-1]:
+            # searchsorted needs an increasing grid; a decreasing one (e.g. a
+            # wavelength_list given as [high, low, n]) falls back to the scan
+            return int(np.abs(wavelength_array - target_wavelength).argmin())
+        _idx = int(np.searchsorted(wavelength_array, target_wavelength))
+        if _idx == 0:
+            return 0
+        if _idx == _n:
+            return _n - 1
+        # pick the closer of the two neighbours, preferring the lower one on a tie like argmin
+        if (target_wavelength - wavelength_array[_idx - 1]) <= (
+            wavelength_array[_idx] - target_wavelength
+        ):
+            return _idx - 1
+        return _idx
 
     def _compute_pv_stpv_power_density(self, wavelength_array):
         """ method to compute the radiated power density of a PV-STPV structure specifically 
@@ -192,11 +323,12 @@ class Therml:
         _lambda_max = 4150e-9
 
         # get the index associated with these upper- and lower-wavelengths
-        _min_idx = np.abs(wavelength_array - _lambda_min).argmin()
-        _max_idx = np.abs(wavelength_array - _lambda_max).argmin()
+        _min_idx = self._compute_nearest_wavelength_index(wavelength_array, _lambda_min)
+        _max_idx = self._compute_nearest_wavelength_index(wavelength_array, _lambda_max)
 
-        # integrate the thermal emission spectrum over wavelength range using np.trapz
-        self.pv_stpv_exciton_splitting_power = np.pi * np.trapz(self.thermal_emission_array[_min_idx:_max_idx], wavelength_array[_min_idx:_max_idx])
+        # integrate the thermal emission spectrum over wavelength range with the trapezoid rule
+        _w = self._compute_quadrature_weights(wavelength_array[_min_idx:_max_idx])
+        self.pv_stpv_exciton_splitting_power = np.pi * (self.thermal_emission_array[_min_idx:_max_idx] @ _w)
 
     def _compute_power_density(self, wavelength_array):
         """method to compute the power density from blackbody spectrum and thermal emission spectrum
@@ -215,13 +347,14 @@ class Therml:
 
         """
 
-        # integrate blackbody spectrum over wavelength using np.trapz
-        self.blackbody_power_density = np.trapz(
-            self.blackbody_spectrum, wavelength_array
-        )
+        # trapezoid rule weights for integrating over wavelength
+        _w = self._compute_quadrature_weights(wavelength_array)
+
+        # integrate blackbody spectrum over wavelength
+        self.blackbody_power_density = self.blackbody_spectrum @ _w
 
-        # integrate the thermal emission spectrum over wavelength using np.trapz
-        self.power_density = np.trapz(self.thermal_emission_array, wavelength_array)
+        # integrate the thermal emission spectrum over wavelength
+        self.power_density = self.thermal_emission_array @ _w
 
         # account for angular integrals over hemisphere (assuming no angle dependence of emissivity)
         self.blackbody_power_density *= np.pi
@@ -251,14 +384,10 @@ class Therml:
         Equation (5) of https://journals.aps.org/prresearch/abstract/10.1103/PhysRevResearch.2.013018
 
         """
-        _ngr = len(self.thermal_emission_gradient_array[0, :])
-        # integrate the thermal emission spectrum over wavelength using np.trapz
-        self.power_density_gradient = np.zeros(_ngr)
-
-        for i in range(0, _ngr):
-            self.power_density_gradient[i] = np.pi * np.trapz(
-                self.thermal_emission_gradient_array[:, i], wavelength_array
-            )
+        # integrate every column of the thermal emission gradient over wavelength
+        # as a single product with the trapezoid rule weights
+        _w = self._compute_quadrature_weights(wavelength_array)
+        self.power_density_gradient = np.pi * (_w @ self.thermal_emission_gradient_array)
 
     def _compute_photopic_luminosity(self, wavelength_array):
         """computes the photopic luminosity function from a Gaussian fit
@@ -281,7 +410,13 @@ class Therml:
         b = 2.59462e14
         c = 5.60186e-07
 
-        self._photopic_luminosity_array = a * np.exp(-b * (wavelength_array - c) ** 2)
+        # a * exp(-b * (lambda - c)^2) evaluated in place in a single buffer
+        _vl = np.subtract(wavelength_array, c, dtype=np.float64)
+        _vl *= _vl
+        _vl *= -b
+        np.exp(_vl, out=_vl)
+        _vl *= a
+        self._photopic_luminosity_array = _vl
 
     def _compute_stpv_power_density(self, wavelength_array):
         """method to compute the stpv power density from the thermal emission spectrum of a structure
@@ -315,15 +450,15 @@ class Therml:
         ) / self.lambda_bandgap
 
         # determine the index corresponding to lambda_bandgap in the wavelength_array
-        # which will be used to determine the appropriate slice to feed to np.trapz
-        bg_idx = np.abs(wavelength_array - self.lambda_bandgap).argmin()
+        # which will be used to determine the appropriate slice to integrate over
+        bg_idx = self._compute_nearest_wavelength_index(
+            wavelength_array, self.lambda_bandgap
+        )
 
         # integrate the power density between 0 to lambda_bandgap
-        # by feeding the slice of the power_density_array and wavelength_array
-        # from 0:bg_idx to the trapz function
-        self.stpv_power_density = np.pi * np.trapz(
-            power_density_array[:bg_idx], wavelength_array[:bg_idx]
-        )
+        # using the trapezoid rule weights of the slice of wavelength_array from 0:bg_idx
+        _w_sub = self._compute_quadrature_weights(wavelength_array[:bg_idx])
+        self.stpv_power_density = np.pi * (power_density_array[:bg_idx] @ _w_sub)
 
     def _compute_stpv_power_density_gradient(self, wavelength_array):
         """method to compute the power density from blackbody spectrum and thermal emission spectrum
@@ -342,20 +477,14 @@ class Therml:
         Equation (5) of https://journals.aps.org/prresearch/abstract/10.1103/PhysRevResearch.2.013018
 
         """
-        _ngr = len(self.thermal_emission_gradient_array[0, :])
-        # integrate the thermal emission spectrum over wavelength using np.trapz
-        self.stpv_power_density_gradient = np.zeros(_ngr)
-        # compute the useful power density spectrum
-
-        for i in range(0, _ngr):
-            stpv_power_density_array_prime = (
-                self.thermal_emission_gradient_array[:, i]
-                * wavelength_array
-                / self.lambda_bandgap
-            )
-            self.stpv_power_density_gradient[i] = np.pi * np.trapz(
-                stpv_power_density_array_prime, wavelength_array
-            )
+        # compute the useful power density spectrum for every column of the gradient
+        _weights = wavelength_array / self.lambda_bandgap
+        stpv_power_density_array_prime = (
+            self.thermal_emission_gradient_array * _weights[:, np.newaxis]
+        )
+        # integrate every column over wavelength as a single product with the trapezoid rule weights
+        _w = self._compute_quadrature_weights(wavelength_array)
+        self.stpv_power_density_gradient = np.pi * (_w @ stpv_power_density_array_prime)
 
     def _compute_stpv_spectral_efficiency(self, wavelength_array):
         """method to compute the stpv spectral efficiency from the thermal emission spectrum of a structure
@@ -412,12 +541,6 @@ class Therml:
         Equation (4) of https://journals.aps.org/prresearch/abstract/10.1103/PhysRevResearch.2.013018
 
         """
-        # get the number of elements in the gradient
-        _ngr = len(self.thermal_emission_gradient_array[0, :])
-
-        # initialize the gradient array
-        self.stpv_spectral_efficiency_gradient = np.zeros(_ngr)
-
         # using the notation from Eq. (4)
         # from https://journals.aps.org/prresearch/abstract/10.1103/PhysRevResearch.2.013018
         self._compute_stpv_power_density(wavelength_array)
@@ -427,24 +550,27 @@ class Therml:
         _rho = self.stpv_power_density
 
         # determine the index corresponding to lambda_bandgap in the wavelength_array
-        # which will be used to determine the appropriate slice to feed to np.trapz
-        _bg_idx = np.abs(wavelength_array - self.lambda_bandgap).argmin()
-
-        for i in range(0, _ngr):
-            _rho_prime_integrand = (
-                self.thermal_emission_gradient_array[:_bg_idx, i]
-                * wavelength_array[:_bg_idx]
-                / self.lambda_bandgap
-            )
-            _rho_prime = np.pi * np.trapz(
-                _rho_prime_integrand, wavelength_array[:_bg_idx]
-            )
-            _P_prime = np.pi * np.trapz(
-                self.thermal_emission_gradient_array[:, i], wavelength_array
-            )
-            self.stpv_spectral_efficiency_gradient[i] = (
-                _rho_prime * _P - _P_prime * _rho
-            ) / (_P * _P)
+        # which will be used to determine the appropriate slice to integrate over
+        _bg_idx = self._compute_nearest_wavelength_index(
+            wavelength_array, self.lambda_bandgap
+        )
+
+        # trapezoid rule weights for the full and sub-bandgap wavelength ranges
+        _w = self._compute_quadrature_weights(wavelength_array)
+        _w_sub = self._compute_quadrature_weights(wavelength_array[:_bg_idx])
+
+        # derivatives of rho and P for every element of the gradient at once; the
+        # lambda / lambda_bandgap factor of the rho integrand is folded into the weights
+        _rho_prime = (
+            np.pi
+            * ((_w_sub * wavelength_array[:_bg_idx]) @ self.thermal_emission_gradient_array[:_bg_idx])
+            / self.lambda_bandgap
+        )
+        _P_prime = np.pi * (_w @ self.thermal_emission_gradient_array)
+
+        self.stpv_spectral_efficiency_gradient = (_rho_prime * _P - _P_prime * _rho) / (
+            _P * _P
+        )
 
     def _compute_pv_short_circuit_current(self, wavelength_array, absorptivity_array, spectral_response, solar_spectrum):
         """method to approximate the short circuit current of a PV cell
@@ -473,7 +599,8 @@ class Therml:
         None
         
         """
-        self.pv_short_circuit_current = np.trapz(absorptivity_array * spectral_response * solar_spectrum, wavelength_array)
+        _w = self._compute_quadrature_weights(wavelength_array)
+        self.pv_short_circuit_current = (absorptivity_array * spectral_response * solar_spectrum) @ _w
 
     def _compute_luminous_efficiency(self, wavelength_array):
         """method to compute the luminous efficiency for an incandescent from the thermal emission spectrum of a structure
@@ -505,8 +632,9 @@ class Therml:
         vl = self._photopic_luminosity_array
         TE = self.thermal_emission_array
 
-        Numerator = np.trapz(vl * TE, wavelength_array)
-        Denominator = np.trapz(TE, wavelength_array)
+        _w = self._compute_quadrature_weights(wavelength_array)
+        Numerator = (vl * TE) @ _w
+        Denominator = TE @ _w
 
         self.luminous_efficiency = Numerator / Denominator
 
@@ -533,25 +661,77 @@ class Therml:
         See Eq. (2) of https://www.nature.com/articles/nature13883
         """
 
-        num_angles = len(theta_vals)
         self._compute_therml_spectrum(wavelength_array, emissivity_array_s[0, :])
 
-        # loop over angles
-        P_rad = 0.0
-        for i in range(0, num_angles):
-            _TE = (
-                self.blackbody_spectrum
-                * np.cos(theta_vals[i])
-                * 0.5
-                * (emissivity_array_p[i, :] + emissivity_array_s[i, :])
-            )
-            _TE_INT = np.trapz(_TE, wavelength_array)
-            P_rad += _TE_INT * np.sin(theta_vals[i]) * theta_weights[i]
+        # angular factors, evaluated once for all angles
+        _cos_t = np.cos(theta_vals)
+        _sw = np.sin(theta_vals) * theta_weights
+
+        # thermal emission spectrum for all angles at once: rows are angles, columns wavelengths
+        _TE = (
+            self.blackbody_spectrum[np.newaxis, :]
+            * _cos_t[:, np.newaxis]
+            * 0.5
+            * (emissivity_array_p + emissivity_array_s)
+        )
+        # integrate over wavelength for every angle, then sum over angles
+        _TE_INT = _TE @ self._compute_quadrature_weights(wavelength_array)
+        P_rad = _sw @ _TE_INT
 
         P_rad *= np.pi * 2
 
         return P_rad
 
+    def _compute_angle_integrated_gradient(
+        self,
+        angular_spectrum,
+        emissivity_gradient_array_s,
+        emissivity_gradient_array_p,
+        theta_vals,
+        theta_weights,
+        wavelength_array,
+    ):
+        """Method to integrate a spectrum weighted by the polarization-averaged emissivity
+        gradient over wavelength and solid angle, for every element of the gradient
+
+        Arguments
+        ---------
+        angular_spectrum : number_of_angles x number_of_wavelengths numpy array of floats
+            the spectrum the emissivity gradient is weighted by at each angle, including
+            the 0.5 polarization average and the cos(theta) projection
+
+        emissivity_gradient_array_s : number_of_angles x number_of_wavelengths x number_of_gradient_elements numpy array of floats
+            gradient of the s-polarized emissivity
+
+        emissivity_gradient_array_p : number_of_angles x number_of_wavelengths x number_of_gradient_elements numpy array of floats
+            gradient of the p-polarized emissivity
+
+        theta_vals : numpy array of floats
+            the quadrature angles in radians
+
+        theta_weights : numpy array of floats
+            the quadrature weights of theta_vals
+
+        wavelength_array : numpy array of floats
+            the wavelengths that will be integrated over
+
+        Returns
+        -------
+        _gradient : 1 x number_of_gradient_elements numpy array of floats
+            2 pi sum_j sin(theta_j) w_j int angular_spectrum[j] (eps_p' + eps_s')[j] dlambda
+
+        """
+        _w = self._compute_quadrature_weights(wavelength_array)
+        _angle_factor = 2 * np.pi * np.sin(theta_vals) * theta_weights
+
+        # fold the wavelength and angle quadrature weights into the spectrum, then
+        # contract it against each polarization over (angle, wavelength) for every
+        # gradient element at once
+        _kernel = angular_spectrum * _w[np.newaxis, :] * _angle_factor[:, np.newaxis]
+        return np.tensordot(
+            _kernel, emissivity_gradient_array_p, axes=([0, 1], [0, 1])
+        ) + np.tensordot(_kernel, emissivity_gradient_array_s, axes=([0, 1], [0, 1]))
+
     def _compute_thermal_radiated_power_gradient(
         self,
         emissivity_gradient_array_s,
@@ -575,35 +755,23 @@ class Therml:
         See Eq. (2) of https://www.nature.com/articles/nature13883
 
         """
-        num_angles = len(theta_vals)
         # we don't care about the emissivity - just calling this for the blackbody spectrum
         self._compute_therml_spectrum(
             wavelength_array, emissivity_gradient_array_p[0, :, 0]
         )
 
-        _ngr = len(emissivity_gradient_array_s[0, 0, :])
-        _nth = len(emissivity_gradient_array_s[:, 0, 0])
-
-        # instantiate P_rad_prime
-        _emitted_thermal_spectrum_gradient = np.zeros(_ngr)
-        for i in range(0, _ngr):
-            _P_rad_prime = 0
-            for j in range(0, _nth):
-                _TE = (
-                    self.blackbody_spectrum
-                    * np.cos(theta_vals[j])
-                    * 0.5
-                    * (
-                        emissivity_gradient_array_p[j, :, i]
-                        + emissivity_gradient_array_s[j, :, i]
-                    )
-                )
-                _TE_INT = np.trapz(_TE, wavelength_array)
-
-                _P_rad_prime += (
-                    2 * np.pi * _TE_INT * np.sin(theta_vals[j]) * theta_weights[j]
-                )
-            _emitted_thermal_spectrum_gradient[i] = _P_rad_prime
+        # 0.5 * B(lambda) * cos(theta_j) for all angles
+        _bb_cos = (
+            0.5 * np.cos(theta_vals)[:, np.newaxis] * self.blackbody_spectrum[np.newaxis, :]
+        )
+        _emitted_thermal_spectrum_gradient = self._compute_angle_integrated_gradient(
+            _bb_cos,
+            emissivity_gradient_array_s,
+            emissivity_gradient_array_p,
+            theta_vals,
+            theta_weights,
+            wavelength_array,
+        )
 
         return _emitted_thermal_spectrum_gradient
 
@@ -631,8 +799,6 @@ class Therml:
         See Eq. (3) of https://www.nature.com/articles/nature13883
 
         """
-        num_angles = len(theta_vals)
-
         # make sure we are getting the blackbody spectrum of the atmosphere
         # store the structure temperature
         _T_temp = self.temperature
@@ -643,20 +809,27 @@ class Therml:
         # set the structure temperature back to _T_temp in case
         # one wants to compute the thermal emission of the structure again!
         self.temperature = _T_temp
-        P_atm = 0.0
-        for i in range(0, num_angles):
-            # get the term that goes in the exponent of the atmospheric transmissivity
-            _o_over_cos_t = 1 / np.cos(theta_vals[i])
-            _emissivity_atm = (
-                np.ones(len(atmospheric_transmissivity))
-                - atmospheric_transmissivity ** _o_over_cos_t
-            )
-            _TE_atm = self.blackbody_spectrum * _emissivity_atm * np.cos(theta_vals[i])
-            _absorbed_TE_spectrum = (
-                _TE_atm * 0.5 * (emissivity_array_p[i, :] + emissivity_array_s[i, :])
-            )
-            _absorbed_TE = np.trapz(_absorbed_TE_spectrum, wavelength_array)
-            P_atm += _absorbed_TE * np.sin(theta_vals[i]) * theta_weights[i]
+
+        # angular factors, evaluated once for all angles
+        _sw = np.sin(theta_vals) * theta_weights
+        # all angles at once: rows are angles, columns wavelengths
+        _cos_t = np.cos(theta_vals)[:, np.newaxis]
+        # get the term that goes in the exponent of the atmospheric transmissivity
+        _o_over_cos_t = 1 / _cos_t
+        # 1 - tau^(1/cos t) = -expm1(log(tau) / cos t); log(tau) is taken once for all angles
+        # and tau = 0 gives log(tau) = -inf, which correctly yields an emissivity of 1
+        with np.errstate(divide="ignore"):
+            _log_tau = np.log(atmospheric_transmissivity)
+        _emissivity_atm = -np.expm1(_log_tau[np.newaxis, :] * _o_over_cos_t)
+        _TE_atm = self.blackbody_spectrum[np.newaxis, :] * _emissivity_atm * _cos_t
+        _absorbed_TE_spectrum = (
+            _TE_atm * 0.5 * (emissivity_array_p + emissivity_array_s)
+        )
+        # integrate over wavelength for every angle, then sum over angles
+        _absorbed_TE = _absorbed_TE_spectrum @ self._compute_quadrature_weights(
+            wavelength_array
+        )
+        P_atm = _sw @ _absorbed_TE
         P_atm *= 2 * np.pi
 
         return P_atm
@@ -681,10 +854,6 @@ class Therml:
         _absorbed_solar_spectrum_gradient
         """
 
-        _nth = len(theta_vals)
-        _ngr = len(emissivity_gradient_array_p[0, 0, :])
-        _absorbed_atmospheric_radiation_gradient = np.zeros(_ngr)
-
         # make sure we are getting the blackbody spectrum of the atmosphere
         # store the structure temperature
         _T_temp = self.temperature
@@ -698,31 +867,23 @@ class Therml:
         # one wants to compute the thermal emission of the structure again!
         self.temperature = _T_temp
 
-        for i in range(0, _ngr):
-            P_atm_prime = 0
-            for j in range(0, _nth):
-                # get the term that goes in the exponent of the atmospheric transmissivity
-                _o_over_cos_t = 1 / np.cos(theta_vals[j])
-                _emissivity_atm = (
-                    np.ones(len(atmospheric_transmissivity))
-                    - atmospheric_transmissivity ** _o_over_cos_t
-                )
-                _TE_atm = (
-                    self.blackbody_spectrum * _emissivity_atm * np.cos(theta_vals[j])
-                )
-                _absorbed_TE_spectrum = (
-                    _TE_atm
-                    * 0.5
-                    * (
-                        emissivity_gradient_array_p[j, :, i]
-                        + emissivity_gradient_array_s[j, :, i]
-                    )
-                )
-                _absorbed_TE = np.trapz(_absorbed_TE_spectrum, wavelength_array)
-                P_atm_prime += (
-                    2 * np.pi * _absorbed_TE * np.sin(theta_vals[j]) * theta_weights[j]
-                )
-            _absorbed_atmospheric_radiation_gradient[i] = P_atm_prime
+        # 1 - tau^(1/cos t) = -expm1(log(tau) / cos t); log(tau) is taken once for all angles
+        with np.errstate(divide="ignore"):
+            _log_tau = np.log(atmospheric_transmissivity)
+
+        # the atmospheric spectrum 0.5 * B(lambda) * eps_atm(lambda, theta_j) * cos(theta_j)
+        # for all angles
+        _cos_t = np.cos(theta_vals)[:, np.newaxis]
+        _emissivity_atm = -np.expm1(_log_tau[np.newaxis, :] / _cos_t)
+        _TE_atm = 0.5 * self.blackbody_spectrum[np.newaxis, :] * _emissivity_atm * _cos_t
+        _absorbed_atmospheric_radiation_gradient = self._compute_angle_integrated_gradient(
+            _TE_atm,
+            emissivity_gradient_array_s,
+            emissivity_gradient_array_p,
+            theta_vals,
+            theta_weights,
+            wavelength_array,
+        )
 
         return _absorbed_atmospheric_radiation_gradient
 
@@ -748,7 +909,9 @@ class Therml:
             solar_spectrum * 0.5 * (emissivity_array_p + emissivity_array_s)
         )
         # integrate it!
-        P_sun = np.trapz(_absorbed_solar_spectrum, wavelength_array)
+        P_sun = _absorbed_solar_spectrum @ self._compute_quadrature_weights(
+            wavelength_array
+        )
         return P_sun
 
     def _compute_solar_radiated_power_gradient(
@@ -772,20 +935,11 @@ class Therml:
         ----------
         See Eq. (4) of https://www.nature.com/articles/nature13883
         """
-        # get the dimension of the gradient vector
-        _ngr = len(emissivity_gradient_array_s[0, :])
-        _absorbed_solar_spectrum_gradient = np.zeros(_ngr)
-        for i in range(0, _ngr):
-            _absorbed_solar_spectrum_prime = (
-                solar_spectrum
-                * 0.5
-                * (
-                    emissivity_gradient_array_p[:, i]
-                    + emissivity_gradient_array_s[:, i]
-                )
-            )
-            # integrate it!
-            _absorbed_solar_spectrum_gradient[i] = np.trapz(
-                _absorbed_solar_spectrum_prime, wavelength_array
-            )
+        # fold 0.5 * solar_spectrum into the trapezoid rule weights so that every column
+        # of each polarization's emissivity gradient is integrated by one matrix-vector
+        # product, without materializing the absorbed solar spectrum gradient
+        _ws = 0.5 * solar_spectrum * self._compute_quadrature_weights(wavelength_array)
+        _absorbed_solar_spectrum_gradient = (
+            _ws @ emissivity_gradient_array_p + _ws @ emissivity_gradient_array_s
+        )
         return _absorbed_solar_spectrum_gradient